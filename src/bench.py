@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+from pathlib import Path
+
+import zarr
+
+
+def bench_array(array: zarr.Array, repeats: int) -> dict[str, float]:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for ch in range(array.shape[0]):
+            for trc in range(array.shape[1]):
+                for seg in range(array.shape[2]):
+                    _ = array[ch, trc, seg]
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "nbytes": array.nbytes,
+        "nbytes_stored": array.nbytes_stored,
+        "ratio": array.nbytes / array.nbytes_stored,
+        "seconds": best,
+        "mb_per_s": array.nbytes / 1e6 / best if best > 0 else float("inf"),
+    }
+
+
+def bench_store(zarr_path: Path, repeats: int = 3) -> dict[str, dict[str, float]]:
+    if not zarr_path.exists():
+        error_message = f"❌ Zarr store not found: {zarr_path}"
+        raise FileNotFoundError(error_message)
+
+    root = zarr.open_group(str(zarr_path), mode="r")
+    results = {"raw": bench_array(root["raw"], repeats)}
+    if "overview" in root and "0" in root["overview"]:
+        results["overview/0"] = bench_array(root["overview"]["0"], repeats)
+    return results
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Measure compression ratio and decode speed of a Zarr store."
+    )
+    parser.add_argument("-i", "--input", required=True, help="Path to .zarr store")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed passes, best is kept (default: 3)")
+    args = parser.parse_args(argv)
+
+    zarr_path = Path(args.input).expanduser().resolve()
+    print(f"⏱️  Benchmarking: {zarr_path}")
+    for name, stats in bench_store(zarr_path, repeats=args.repeats).items():
+        print(
+            f"  • {name}: {stats['nbytes'] / 1e6:.1f} MB → {stats['nbytes_stored'] / 1e6:.1f} MB stored "
+            f"(ratio {stats['ratio']:.2f}), decode {stats['seconds']:.3f} s ({stats['mb_per_s']:.0f} MB/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+
+# Subcommand -> (module, help). Modules are only imported once their subcommand runs, so `--help`
+# and `serve` never load h5py/zarr/numcodecs/numpy.
+COMMANDS = {
+    "generate": ("src.generate_data", "Generate synthetic oscilloscope data (.zarr or .h5)"),
+    "convert": ("src.convert_hdf5_to_zarr", "Convert HDF5 → Zarr (overview + metadata)"),
+    "import": ("src.data_to_s3_importer", "Convert .hdf to .zarr and upload to S3 (via mc)"),
+    "serve": ("src.cors_server", "Simple HTTP server with CORS support"),
+    "bench": ("src.bench", "Measure compression ratio and decode speed of a Zarr store"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="ZoomingOnline command-line tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="<command>")
+    for name, (_, help_text) in COMMANDS.items():
+        # Options are parsed by the subcommand's own main(), including its `--help`.
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args, rest = build_parser().parse_known_args(argv)
+    module_name, _ = COMMANDS[args.command]
+    importlib.import_module(module_name).main(rest, prog=f"python -m src {args.command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
+import time
 from pathlib import Path
 
 import h5py
@@ -27,10 +28,186 @@ def ensure_required_attrs(root: zarr.Group, n_channels: int) -> None:
             print(f"ℹ️  Added missing attr: {key} = {val}")  # noqa: RUF001
 
 
-def convert_hdf5_to_zarr(hdf_path: Path, zarr_path: Path) -> None:  # noqa: C901, PLR0912
+def per_trace(values: object, n_channels: int, n_trcs: int) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr[:, np.newaxis]
+    return np.broadcast_to(arr, (n_channels, n_trcs)).copy()
+
+
+def choose_quantization(data: h5py.Dataset, max_error: float) -> tuple[np.dtype | None, np.ndarray, np.ndarray]:
+    # q = round((value - base) / scale) with scale = 2 * max_error keeps the rounding error <= max_error.
+    # Returns dtype None when no integer type narrower than the source fits the range.
+    n_channels, n_trcs, n_segments = data.shape[:3]
+    scale = np.full((n_channels, n_trcs), 2.0 * max_error)
+    base = np.zeros((n_channels, n_trcs))
+    half_span = 0
+    for ch in range(n_channels):
+        for trc in range(n_trcs):
+            vmin, vmax = np.inf, -np.inf
+            for seg in range(n_segments):
+                segment = data[ch, trc, seg, :]
+                if not np.all(np.isfinite(segment)):
+                    message = (
+                        f"❌ Cannot quantise non-finite samples (NaN/inf) in ch={ch + 1}, trc={trc + 1}, seg={seg + 1}"
+                    )
+                    raise ValueError(message)
+                vmin = min(vmin, float(np.min(segment)))
+                vmax = max(vmax, float(np.max(segment)))
+            base[ch, trc] = (vmin + vmax) / 2
+            half_span = max(half_span, int(np.ceil((vmax - vmin) / 2 / scale[ch, trc])))
+
+    for dtype in (np.dtype(np.int16), np.dtype(np.int32)):
+        if dtype.itemsize < data.dtype.itemsize and half_span <= np.iinfo(dtype).max:
+            return dtype, scale, base
+    return None, scale, base
+
+
+def quantize(segment: np.ndarray, scale: float, base: float, dtype: np.dtype) -> np.ndarray:
+    return np.rint((segment.astype(np.float64) - base) / scale).astype(dtype)
+
+
+# Candidate (filters, compressor) pairs for the adaptive mode. The browser viewer (zarr.js) only decodes
+# compressors, so candidates with filters are tried only when explicitly allowed. Delta is exact only for
+# integers, so it is never offered for float samples.
+COMPRESSION_CANDIDATES = {
+    "zstd3-bitshuffle": (None, numcodecs.Blosc(cname="zstd", clevel=3, shuffle=numcodecs.Blosc.BITSHUFFLE)),
+    "zstd9-bitshuffle": (None, numcodecs.Blosc(cname="zstd", clevel=9, shuffle=numcodecs.Blosc.BITSHUFFLE)),
+    "lz4-bitshuffle": (None, numcodecs.Blosc(cname="lz4", clevel=5, shuffle=numcodecs.Blosc.BITSHUFFLE)),
+    "lz4-shuffle": (None, numcodecs.Blosc(cname="lz4", clevel=5, shuffle=numcodecs.Blosc.SHUFFLE)),
+    "delta-zstd9": ("delta", numcodecs.Blosc(cname="zstd", clevel=9, shuffle=numcodecs.Blosc.SHUFFLE)),
+    "delta-zstd3-bitshuffle": ("delta", numcodecs.Blosc(cname="zstd", clevel=3, shuffle=numcodecs.Blosc.BITSHUFFLE)),
+    "none": (None, None),
+}
+OBJECTIVES = ("size", "speed", "balanced")
+
+
+def make_filters(kind: str | None, dtype: np.dtype) -> list[numcodecs.abc.Codec] | None:
+    return [numcodecs.Delta(dtype=dtype)] if kind == "delta" else None
+
+
+def sample_blocks(data: h5py.Dataset, ch: int, trc: int, n_blocks: int, block_size: int) -> list[np.ndarray]:
+    n_segments, n_samples = data.shape[2:]
+    block_size = min(block_size, n_samples)
+    blocks = []
+    for i in range(n_blocks):
+        # Spread the blocks evenly over all samples of all segments of this trace.
+        pos = (i * n_segments * n_samples) // n_blocks
+        seg, start = divmod(pos, n_samples)
+        start = min(start, n_samples - block_size)
+        blocks.append(data[ch, trc, seg, start : start + block_size])
+    return blocks
+
+
+def measure_codec(
+    blocks: list[np.ndarray], filters: list[numcodecs.abc.Codec] | None, compressor: numcodecs.abc.Codec | None
+) -> tuple[int, int, float]:
+    nbytes, nbytes_encoded, decode_seconds = 0, 0, 0.0
+    for block in blocks:
+        buf = block
+        for f in filters or []:
+            buf = f.encode(buf)
+        encoded = compressor.encode(buf) if compressor is not None else np.ascontiguousarray(buf).tobytes()
+
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            # Without a compressor, time the copy out of the chunk buffer that a read still pays for.
+            buf = compressor.decode(encoded) if compressor is not None else np.frombuffer(encoded, block.dtype).copy()
+            for f in reversed(filters or []):
+                buf = f.decode(buf)
+            best = min(best, time.perf_counter() - start)
+
+        nbytes += block.nbytes
+        nbytes_encoded += len(encoded)
+        decode_seconds += best
+    return nbytes, nbytes_encoded, decode_seconds
+
+
+def objective_cost(objective: str, ratio: float, decode_mb_s: float, bandwidth_mb_s: float) -> float:
+    if objective == "size":
+        return 1 / ratio
+    if objective == "speed":
+        return 1 / decode_mb_s
+    if objective == "balanced":
+        # Seconds per MB of samples: fetch the compressed bytes, then decode them.
+        return 1 / (ratio * bandwidth_mb_s) + 1 / decode_mb_s
+    message = f"❌ Unknown objective: {objective} (expected one of {', '.join(OBJECTIVES)})"
+    raise ValueError(message)
+
+
+def codec_stats(nbytes: int, nbytes_encoded: int, seconds: float) -> dict[str, float]:
+    return {
+        "ratio": nbytes / max(nbytes_encoded, 1),
+        "decode_mb_s": nbytes / 1e6 / max(seconds, 1e-9),
+    }
+
+
+def choose_compression(
+    blocks_by_trace: dict[tuple[int, int], list[np.ndarray]],
+    objective: str,
+    *,
+    bandwidth_mb_s: float = 100.0,
+    allow_filters: bool = False,
+    allow_uncompressed: bool = True,
+) -> tuple[str, dict, list[dict]]:
+    # Zarr v2 has one codec pipeline per array, so the per-(ch, trc) measurements are aggregated into a single
+    # choice for 'raw'. The report keeps only the per-trace winners; full per-trace stats are returned separately.
+    dtype = next(iter(blocks_by_trace.values()))[0].dtype
+    use_filters = allow_filters and np.issubdtype(dtype, np.integer)
+    candidates = {
+        name: (kind, compressor)
+        for name, (kind, compressor) in COMPRESSION_CANDIDATES.items()
+        if (kind is None or use_filters) and (compressor is not None or allow_uncompressed)
+    }
+    totals = {name: [0, 0, 0.0] for name in candidates}
+    per_trace_report = []
+    per_trace_details = []
+    for (ch, trc), blocks in blocks_by_trace.items():
+        trace_stats = {}
+        for name, (kind, compressor) in candidates.items():
+            nbytes, nbytes_encoded, seconds = measure_codec(blocks, make_filters(kind, blocks[0].dtype), compressor)
+            totals[name] = [t + v for t, v in zip(totals[name], (nbytes, nbytes_encoded, seconds), strict=True)]
+            trace_stats[name] = codec_stats(nbytes, nbytes_encoded, seconds)
+        best = min(
+            trace_stats, key=lambda n: objective_cost(objective, **trace_stats[n], bandwidth_mb_s=bandwidth_mb_s)
+        )
+        per_trace_report.append({"ch": ch, "trc": trc, "best": best})
+        per_trace_details.append({"ch": ch, "trc": trc, "best": best, "candidates": trace_stats})
+
+    overall = {name: codec_stats(*total) for name, total in totals.items()}
+    chosen = min(overall, key=lambda n: objective_cost(objective, **overall[n], bandwidth_mb_s=bandwidth_mb_s))
+    report = {
+        "objective": objective,
+        "bandwidth_mb_s": bandwidth_mb_s,
+        "chosen": chosen,
+        "candidates": overall,
+        "per_trace": per_trace_report,
+    }
+    return chosen, report, per_trace_details
+
+
+def convert_hdf5_to_zarr(  # noqa: C901, PLR0912, PLR0913, PLR0915
+    hdf_path: Path,
+    zarr_path: Path,
+    *,
+    max_error: float | None = None,
+    objective: str | None = None,
+    bandwidth_mb_s: float = 100.0,
+    allow_filters: bool = False,
+) -> None:
     if not hdf_path.exists():
         error_message = f"❌ Input file not found: {hdf_path}"
         raise FileNotFoundError(error_message)
+    if objective is not None and objective not in OBJECTIVES:
+        message = f"❌ Unknown objective: {objective} (expected one of {', '.join(OBJECTIVES)})"
+        raise ValueError(message)
+    if max_error is not None and max_error <= 0:
+        message = f"❌ max_error must be positive, got {max_error}"
+        raise ValueError(message)
+    if bandwidth_mb_s <= 0:
+        message = f"❌ bandwidth must be positive, got {bandwidth_mb_s} MB/s"
+        raise ValueError(message)
 
     print(f"📂 Opening HDF5: {hdf_path}")
     with h5py.File(hdf_path, "r") as h5:
@@ -39,6 +216,19 @@ def convert_hdf5_to_zarr(hdf_path: Path, zarr_path: Path) -> None:  # noqa: C901
             raise KeyError(message)
 
         data = h5["samples"]
+
+        # Scan the samples before touching the output, so a bad capture does not clobber an existing store.
+        out_dtype = data.dtype
+        quantizing = max_error is not None and np.issubdtype(data.dtype, np.floating)
+        if max_error is not None and not quantizing:
+            print(f"ℹ️  Source dtype {data.dtype} is not floating point, skipping quantisation")  # noqa: RUF001
+        if quantizing:
+            print(f"📏 Choosing integer encoding (max error {max_error})...")
+            int_dtype, scale, base = choose_quantization(data, max_error)
+            quantizing = int_dtype is not None
+            if not quantizing:
+                print(f"ℹ️  No integer type smaller than {data.dtype} fits max error {max_error}, copying as-is")  # noqa: RUF001
+
         root = zarr.open_group(str(zarr_path), mode="w")
 
         for k, v in h5.attrs.items():
@@ -57,49 +247,133 @@ def convert_hdf5_to_zarr(hdf_path: Path, zarr_path: Path) -> None:  # noqa: C901
 
         ensure_required_attrs(root, n_channels=data.shape[0])
 
+        if quantizing:
+            out_dtype = int_dtype
+            gains = per_trace(root.attrs["vertical_gains"], *data.shape[:2])
+            offsets = per_trace(root.attrs["vertical_offsets"], *data.shape[:2])
+            # value = q * scale + base, so volts = value * gain - offset = q * (scale * gain) - (offset - base * gain)
+            root.attrs["vertical_gains"] = (gains * scale).tolist()
+            root.attrs["vertical_offsets"] = (offsets - base * gains).tolist()
+            print(f"  • Encoding {data.dtype} → {out_dtype}")
+
+        filters = None
         compressor = numcodecs.Blosc(cname="zstd", clevel=3, shuffle=numcodecs.Blosc.BITSHUFFLE)
-        chunk_size = 10_000_000
+        # Zarr v2 pads every chunk to full size, so never let a chunk be longer than a segment.
+        chunk_size = min(10_000_000, data.shape[-1])
+        if objective is not None:
+            print(f"🧪 Sampling blocks to choose compression (objective: {objective})...")
+            blocks_by_trace = {}
+            for ch in range(data.shape[0]):
+                for trc in range(data.shape[1]):
+                    blocks = sample_blocks(data, ch, trc, n_blocks=3, block_size=100_000)
+                    if quantizing:
+                        blocks = [quantize(b, scale[ch, trc], base[ch, trc], out_dtype) for b in blocks]
+                    blocks_by_trace[ch, trc] = blocks
+            chosen, report, per_trace_details = choose_compression(
+                blocks_by_trace,
+                objective,
+                bandwidth_mb_s=bandwidth_mb_s,
+                allow_filters=allow_filters,
+                # Without a compressor the padding of a partial last chunk is stored in full.
+                allow_uncompressed=data.shape[-1] % chunk_size == 0,
+            )
+            kind, compressor = COMPRESSION_CANDIDATES[chosen]
+            filters = make_filters(kind, out_dtype)
+            # The viewer downloads the root .zattrs on every open, so the bulky per-trace stats go on 'raw'.
+            root.attrs["compression"] = report
+            stats = report["candidates"][chosen]
+            print(f"  • Chosen: {chosen} (ratio {stats['ratio']:.2f}, decode {stats['decode_mb_s']:.0f} MB/s)")
+
         print("📦 Creating dataset 'raw'...")
         raw = root.create_dataset(
             "raw",
             shape=data.shape,
             chunks=(1, 1, 1, chunk_size),
+            filters=filters,
             compressor=compressor,
-            dtype=data.dtype,
+            dtype=out_dtype,
         )
+        if objective is not None:
+            raw.attrs["compression_per_trace"] = per_trace_details
 
-        for ch in range(data.shape[0]):
-            for trc in range(data.shape[1]):
-                for seg in range(data.shape[2]):
-                    print(f"  • Coping raw: ch={ch + 1}, trc={trc + 1}, seg={seg + 1}")
-                    raw[ch, trc, seg, :] = data[ch, trc, seg, :]
-
-        print("🔍 Generating overview (0)...")
         ov_group = root.create_group("overview")
         downsample = max(1, data.shape[-1] // 4000)
         ov_shape = (*data.shape[:-1], 2, data.shape[-1] // downsample)
-        overview = ov_group.create_dataset("0", shape=ov_shape, chunks=(1, 1, 1, 2, ov_shape[-1]), dtype=data.dtype)
+        overview = ov_group.create_dataset("0", shape=ov_shape, chunks=(1, 1, 1, 2, ov_shape[-1]), dtype=out_dtype)
 
+        max_abs_error = 0.0
         for ch in range(data.shape[0]):
             for trc in range(data.shape[1]):
                 for seg in range(data.shape[2]):
-                    overview[ch, trc, seg, :, :] = create_overview(data[ch, trc, seg, :], downsample)
+                    print(f"  • Coping raw + overview (0): ch={ch + 1}, trc={trc + 1}, seg={seg + 1}")
+                    segment = data[ch, trc, seg, :]
+                    if quantizing:
+                        encoded = quantize(segment, scale[ch, trc], base[ch, trc], out_dtype)
+                        decoded = encoded * scale[ch, trc] + base[ch, trc]
+                        max_abs_error = max(max_abs_error, float(np.max(np.abs(decoded - segment), initial=0.0)))
+                        segment = encoded
+                    raw[ch, trc, seg, :] = segment
+                    overview[ch, trc, seg, :, :] = create_overview(segment, downsample)
+
+        if quantizing:
+            root.attrs["quantization"] = {
+                "source_dtype": str(data.dtype),
+                "dtype": str(out_dtype),
+                "max_error_bound": max_error,
+                "max_abs_error": max_abs_error,
+                "source_nbytes": int(data.nbytes),
+                "nbytes_stored": int(raw.nbytes_stored),
+                "size_reduction": data.nbytes / raw.nbytes_stored,
+            }
+            print(
+                f"📉 Quantised {data.dtype} → {out_dtype}: {data.nbytes} → {raw.nbytes_stored} bytes stored "
+                f"({data.nbytes / raw.nbytes_stored:.1f}x smaller)"
+            )
+            print(f"   Max abs error: {max_abs_error:.3g} (bound {max_error})")
 
     print(f"✅ Done! Saved: {zarr_path}")
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Conversion HDF5 → Zarr (overview + metadata).")
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    parser = argparse.ArgumentParser(prog=prog, description="Conversion HDF5 → Zarr (overview + metadata).")
     parser.add_argument("-i", "--input", required=True, help="Input file .hdf")
     parser.add_argument("-o", "--output-dir", required=True, help="Output dir for .zarr")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--max-error",
+        type=float,
+        help="Quantise float samples to int16/int32 within this absolute error (source units)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        choices=OBJECTIVES,
+        help="Choose the raw compression by sampling the data: best ratio, fastest decode, or balanced",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=100.0,
+        help="Network bandwidth in MB/s assumed by --adaptive balanced (default: 100)",
+    )
+    parser.add_argument(
+        "--allow-filters",
+        action="store_true",
+        help="Also try Delta-filtered codecs in --adaptive mode (not readable by the browser viewer)",
+    )
+    args = parser.parse_args(argv)
 
     hdf_path = Path(args.input).expanduser().resolve()
     out_dir = Path(args.output_dir).expanduser().resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
     zarr_path = out_dir / hdf_path.with_suffix(".zarr").name
-    convert_hdf5_to_zarr(hdf_path, zarr_path)
+    convert_hdf5_to_zarr(
+        hdf_path,
+        zarr_path,
+        max_error=args.max_error,
+        objective=args.adaptive,
+        bandwidth_mb_s=args.bandwidth,
+        allow_filters=args.allow_filters,
+    )
 
 
 if __name__ == "__main__":
@@ -17,10 +17,10 @@ def run_server(port: int) -> None:
         httpd.serve_forever()
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Simple HTTP server with CORS support")
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    parser = argparse.ArgumentParser(prog=prog, description="Simple HTTP server with CORS support")
     parser.add_argument("--port", "-p", type=int, default=8000, help="Port number to run the server on (default: 8000)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     run_server(args.port)
 
 
@@ -9,8 +9,6 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-from src.convert_hdf5_to_zarr import convert_hdf5_to_zarr
-
 
 def load_s3_env() -> dict[str, str]:
     load_dotenv()
@@ -22,10 +20,28 @@ def load_s3_env() -> dict[str, str]:
     }
 
 
-def convert_and_get_zarr_path(hdf_path: Path, output_dir: Path) -> Path:
+def convert_and_get_zarr_path(  # noqa: PLR0913
+    hdf_path: Path,
+    output_dir: Path,
+    *,
+    max_error: float | None = None,
+    objective: str | None = None,
+    bandwidth_mb_s: float = 100.0,
+    allow_filters: bool = False,
+) -> Path:
+    # Imported here so that `--help` does not pay for h5py/zarr/numcodecs/numpy.
+    from src.convert_hdf5_to_zarr import convert_hdf5_to_zarr  # noqa: PLC0415
+
     zarr_path = output_dir / hdf_path.with_suffix(".zarr").name
     print(f"\n🔄 Converting {hdf_path} → {zarr_path}")
-    convert_hdf5_to_zarr(hdf_path, zarr_path)
+    convert_hdf5_to_zarr(
+        hdf_path,
+        zarr_path,
+        max_error=max_error,
+        objective=objective,
+        bandwidth_mb_s=bandwidth_mb_s,
+        allow_filters=allow_filters,
+    )
     print(f"✅ Conversion complete: {zarr_path}")
     return zarr_path
 
@@ -70,18 +86,25 @@ def upload_zarr_with_mc(
         raise
 
 
-def main() -> None:
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
     env = load_s3_env()
 
-    parser = argparse.ArgumentParser(description="Convert .hdf to .zarr and upload to S3 (via mc).")
+    parser = argparse.ArgumentParser(prog=prog, description="Convert .hdf to .zarr and upload to S3 (via mc).")
     parser.add_argument("-i", "--input", required=True, help="Path to .hdf file")
     parser.add_argument("-o", "--output-dir", required=True, help="Local dir for .zarr")
     parser.add_argument("--bucket", help="S3 bucket (overrides .env)")
     parser.add_argument("--skip-upload", action="store_true", help="Only convert, skip mc upload")
     parser.add_argument("--keep-local", action="store_true", help="Keep local .zarr after upload")
     parser.add_argument("--mc-alias", default="cyf-public", help="MinIO alias (default: cyf-public)")
+    parser.add_argument("--max-error", type=float, help="Quantise float samples within this absolute error")
+    # Same as convert_hdf5_to_zarr.OBJECTIVES, repeated so that `--help` does not import the converter.
+    parser.add_argument(
+        "--adaptive", choices=["size", "speed", "balanced"], help="Choose raw compression by sampling the data"
+    )
+    parser.add_argument("--bandwidth", type=float, default=100.0, help="MB/s assumed by --adaptive balanced")
+    parser.add_argument("--allow-filters", action="store_true", help="Also try Delta-filtered codecs in --adaptive")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     hdf_path = Path(args.input).expanduser().resolve()
     output_dir = Path(args.output_dir).expanduser().resolve()
@@ -98,7 +121,14 @@ def main() -> None:
         raise ValueError(error_message)
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    zarr_path = convert_and_get_zarr_path(hdf_path, output_dir)
+    zarr_path = convert_and_get_zarr_path(
+        hdf_path,
+        output_dir,
+        max_error=args.max_error,
+        objective=args.adaptive,
+        bandwidth_mb_s=args.bandwidth,
+        allow_filters=args.allow_filters,
+    )
 
     if args.skip_upload:
         print("⏭️ Upload skipped (--skip-upload).")
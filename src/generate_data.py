@@ -183,8 +183,8 @@ def save_hdf5(path: Path, data: np.ndarray) -> None:
     print(f"Saved HDF5 file with shape {data.shape} at: {path}")
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Generate realistic dummy oscilloscope waveform data")
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    parser = argparse.ArgumentParser(prog=prog, description="Generate realistic dummy oscilloscope waveform data")
     parser.add_argument(
         "--output",
         "-o",
@@ -208,7 +208,7 @@ def main() -> None:
         action="store_true",
         help="Generate a minimal dataset for quick testing (overrides other size parameters)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     output_path = Path(args.output)
     ext = output_path.suffix.lower()
 
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.bench import bench_store
+from src.generate_data import generate_realistic_data, save_zarr
+
+
+def test_bench_store(tmp_path: Path) -> None:
+    zarr_path = tmp_path / "data.zarr"
+    data, horiz_interval, gains, offsets = generate_realistic_data(
+        num_samples=10_000, num_channels=1, num_trc_files=1, num_segments=2
+    )
+    save_zarr(zarr_path, data, horiz_interval, gains, offsets)
+
+    results = bench_store(zarr_path, repeats=1)
+
+    assert set(results) == {"raw", "overview/0"}
+    assert results["raw"]["nbytes"] == data.nbytes
+    assert results["raw"]["ratio"] > 0
+    assert np.isfinite(results["raw"]["seconds"])
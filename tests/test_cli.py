@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import zarr
+
+from src.cli import main
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = {"h5py", "zarr", "numcodecs", "numpy"}
+STARTUP_BUDGET_US = 500_000
+
+
+def import_times(*args: str) -> dict[str, tuple[int, bool]]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "src", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self |  cumulative | <indent>module", nested imports are indented.
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cum, name = line.removeprefix("import time:").split("|")
+        if cum.strip().isdigit():
+            times[name.strip()] = (int(cum), not name.startswith("  "))
+    return times
+
+
+@pytest.mark.parametrize("args", [("--help",), ("serve", "--help"), ("import", "--help")])
+def test_startup_skips_heavy_imports(args: tuple[str, ...]) -> None:
+    times = import_times(*args)
+
+    assert not HEAVY_MODULES & times.keys()
+    assert sum(cum for cum, top_level in times.values() if top_level) < STARTUP_BUDGET_US
+
+
+def test_import_times_sees_heavy_imports() -> None:
+    assert import_times("convert", "--help").keys() >= HEAVY_MODULES
+
+
+def test_cli_dispatches_to_subcommand(tmp_path: Path) -> None:
+    zarr_path = tmp_path / "data.zarr"
+    main(["generate", "-o", str(zarr_path), "--samples", "1000", "--channels", "1", "--segments", "1"])
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    assert z["raw"].shape == (1, 1, 1, 1000)
+    assert z["raw"].dtype == np.int16
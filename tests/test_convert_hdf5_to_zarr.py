@@ -2,9 +2,13 @@ from pathlib import Path
 
 import h5py
 import numpy as np
+import pytest
 import zarr
 
-from src.convert_hdf5_to_zarr import convert_hdf5_to_zarr
+from src.convert_hdf5_to_zarr import choose_compression, convert_hdf5_to_zarr, objective_cost
+
+# Far above any real memory copy; an untimed "decode" reports ~1e8 MB/s.
+MAX_PLAUSIBLE_DECODE_MB_S = 1e6
 
 
 def create_dummy_hdf5_file(file_path: Path) -> np.ndarray:
@@ -37,3 +41,194 @@ def test_convert_hdf5_to_zarr(tmp_path: Path) -> None:
     min_vals = overview[0, 0, 0, 0, :]
     max_vals = overview[0, 0, 0, 1, :]
     assert np.all(min_vals <= max_vals)
+
+
+def test_convert_hdf5_to_zarr_quantizes_float_samples(tmp_path: Path) -> None:
+    rng = np.random.default_rng()
+    data = rng.normal(0.0, 0.05, size=(2, 3, 2, 1000)).astype(np.float32)
+    data[1] += 0.5
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+        f.create_dataset("vertical_gain", data=np.full((2, 3), 2.0))
+        f.create_dataset("vertical_offset", data=np.full((2, 3), 0.1))
+
+    zarr_path = tmp_path / "data.zarr"
+    max_error = 1e-5
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, max_error=max_error)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    assert z["raw"].dtype == np.int16
+    assert z["overview"]["0"].dtype == np.int16
+
+    gains = np.asarray(z.attrs["vertical_gains"])[:, :, np.newaxis, np.newaxis]
+    offsets = np.asarray(z.attrs["vertical_offsets"])[:, :, np.newaxis, np.newaxis]
+    volts = z["raw"][:] * gains - offsets
+    expected = data.astype(np.float64) * 2.0 - 0.1
+    assert np.max(np.abs(volts - expected)) <= 2.0 * max_error * (1 + 1e-9)
+
+    report = z.attrs["quantization"]
+    assert report["source_dtype"] == "float32"
+    assert report["dtype"] == "int16"
+    assert report["max_abs_error"] <= max_error
+    assert report["size_reduction"] == pytest.approx(report["source_nbytes"] / report["nbytes_stored"])
+
+
+def test_convert_hdf5_to_zarr_max_error_needs_smaller_dtype(tmp_path: Path) -> None:
+    rng = np.random.default_rng()
+    data = rng.normal(0.0, 1.0, size=(1, 1, 1, 1000)).astype(np.float32)
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, max_error=1e-6)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    assert z["raw"].dtype == np.float32
+    np.testing.assert_array_equal(z["raw"][:], data)
+    assert "quantization" not in z.attrs
+
+
+def test_convert_hdf5_to_zarr_max_error_rejects_nan(tmp_path: Path) -> None:
+    data = np.zeros((1, 1, 1, 1000), dtype=np.float32)
+    data[0, 0, 0, 10] = np.nan
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+
+    zarr_path = tmp_path / "data.zarr"
+    with pytest.raises(ValueError, match="non-finite"):
+        convert_hdf5_to_zarr(hdf5_path, zarr_path, max_error=1e-3)
+    assert not zarr_path.exists()
+
+
+def test_convert_hdf5_to_zarr_bad_max_error_keeps_existing_store(tmp_path: Path) -> None:
+    hdf5_path = tmp_path / "data.h5"
+    original_data = create_dummy_hdf5_file(hdf5_path)
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path)
+
+    with pytest.raises(ValueError, match="max_error must be positive"):
+        convert_hdf5_to_zarr(hdf5_path, zarr_path, max_error=0.0)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    np.testing.assert_array_equal(z["raw"][:], original_data)
+
+
+def test_convert_hdf5_to_zarr_max_error_ignored_for_integer_samples(tmp_path: Path) -> None:
+    hdf5_path = tmp_path / "data.h5"
+    original_data = create_dummy_hdf5_file(hdf5_path)
+
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, max_error=0.5)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    np.testing.assert_array_equal(z["raw"][:], original_data)
+    assert "quantization" not in z.attrs
+
+
+def test_choose_compression_size_objective_and_filters() -> None:
+    rng = np.random.default_rng()
+    flat = np.cumsum(rng.integers(-1, 2, size=100_000)).astype(np.int16)
+    noise = rng.integers(-32768, 32767, size=100_000, dtype=np.int16)
+    blocks_by_trace = {(0, 0): [flat], (1, 0): [noise]}
+
+    chosen, report, details = choose_compression(blocks_by_trace, "size", allow_filters=True)
+    ratios = {name: stats["ratio"] for name, stats in report["candidates"].items()}
+    assert chosen == max(ratios, key=ratios.get)
+    assert "delta-zstd9" in ratios
+    assert report["per_trace"][1] == {"ch": 1, "trc": 0, "best": details[1]["best"]}
+    assert details[1]["candidates"]["none"]["ratio"] == pytest.approx(1.0)
+    assert details[1]["candidates"]["none"]["decode_mb_s"] < MAX_PLAUSIBLE_DECODE_MB_S
+
+    chosen, _, _ = choose_compression(blocks_by_trace, "size")
+    assert not chosen.startswith("delta")
+
+
+@pytest.mark.parametrize(
+    ("objective", "expected"),
+    [("size", "zstd9"), ("speed", "none"), ("balanced", "lz4")],
+)
+def test_objective_cost_picks_expected_candidate(objective: str, expected: str) -> None:
+    stats = {
+        "zstd9": {"ratio": 4.0, "decode_mb_s": 50.0},
+        "lz4": {"ratio": 3.0, "decode_mb_s": 2000.0},
+        "none": {"ratio": 1.0, "decode_mb_s": 10000.0},
+    }
+    chosen = min(stats, key=lambda n: objective_cost(objective, **stats[n], bandwidth_mb_s=100.0))
+    assert chosen == expected
+
+
+def test_choose_compression_skips_delta_for_floats() -> None:
+    rng = np.random.default_rng()
+    block = np.cumsum(rng.normal(0.0, 1e3, size=100_000))
+    _, report, _ = choose_compression({(0, 0): [block]}, "size", allow_filters=True)
+    assert not any(name.startswith("delta") for name in report["candidates"])
+
+
+def test_convert_hdf5_to_zarr_adaptive_compression(tmp_path: Path) -> None:
+    rng = np.random.default_rng()
+    data = np.cumsum(rng.integers(-2, 3, size=(2, 1, 2, 50_000)), axis=-1).astype(np.int16)
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, objective="balanced", allow_filters=True)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    np.testing.assert_array_equal(z["raw"][:], data)
+
+    report = z.attrs["compression"]
+    assert report["objective"] == "balanced"
+    assert report["chosen"] in report["candidates"]
+    assert len(report["per_trace"]) == data.shape[0] * data.shape[1]
+    assert "candidates" not in report["per_trace"][0]
+    assert len(z["raw"].attrs["compression_per_trace"]) == data.shape[0] * data.shape[1]
+
+
+def test_convert_hdf5_to_zarr_adaptive_float_round_trip_is_exact(tmp_path: Path) -> None:
+    rng = np.random.default_rng()
+    data = np.cumsum(rng.normal(0.0, 1e3, size=(1, 1, 2, 50_000)), axis=-1).astype(np.float32)
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, objective="size", allow_filters=True)
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    assert not z["raw"].filters
+    np.testing.assert_array_equal(z["raw"][:], data)
+
+
+def test_convert_hdf5_to_zarr_unknown_objective(tmp_path: Path) -> None:
+    hdf5_path = tmp_path / "data.h5"
+    create_dummy_hdf5_file(hdf5_path)
+
+    with pytest.raises(ValueError, match="Unknown objective"):
+        convert_hdf5_to_zarr(hdf5_path, tmp_path / "data.zarr", objective="smallest")
+
+
+@pytest.mark.parametrize("n_samples", [1_000_000, 15_000_000])
+def test_convert_hdf5_to_zarr_adaptive_speed_does_not_pad_chunks(tmp_path: Path, n_samples: int) -> None:
+    rng = np.random.default_rng()
+    data = rng.integers(-32768, 32767, size=(1, 1, 1, n_samples), dtype=np.int16)
+    hdf5_path = tmp_path / "data.h5"
+    with h5py.File(hdf5_path, "w") as f:
+        f.create_dataset("samples", data=data)
+
+    zarr_path = tmp_path / "data.zarr"
+    convert_hdf5_to_zarr(hdf5_path, zarr_path, objective="speed")
+
+    z = zarr.open_group(str(zarr_path), mode="r")
+    assert z["raw"].nbytes_stored < 1.1 * data.nbytes
+
+
+def test_convert_hdf5_to_zarr_rejects_non_positive_bandwidth(tmp_path: Path) -> None:
+    hdf5_path = tmp_path / "data.h5"
+    create_dummy_hdf5_file(hdf5_path)
+
+    with pytest.raises(ValueError, match="bandwidth must be positive"):
+        convert_hdf5_to_zarr(hdf5_path, tmp_path / "data.zarr", objective="balanced", bandwidth_mb_s=0.0)
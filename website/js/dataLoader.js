@@ -33,6 +33,18 @@ export async function loadZarrData(url) {
     window.appState.lastChunkCache = { key: null, data: null }; // Reset cache on new load
 }
 
+// Zarr dtype (without byte-order prefix) -> TypedArray used for raw slices
+const TYPED_ARRAYS = {
+    i1: Int8Array,
+    u1: Uint8Array,
+    i2: Int16Array,
+    u2: Uint16Array,
+    i4: Int32Array,
+    u4: Uint32Array,
+    f4: Float32Array,
+    f8: Float64Array,
+};
+
 /**
  * Get a slice of raw data with efficient chunk caching
  * @param {number} ch - Channel index
@@ -47,8 +59,9 @@ export async function getRawDataSlice(ch, trc, seg, start, end) {
     const startChunkIdx = Math.floor(start / chunkSize);
     const endChunkIdx = Math.floor((end - 1) / chunkSize);
 
-    // Create buffer for the final data
-    let finalData = new Int16Array(end - start);
+    // Create buffer for the final data, matching the stored dtype (int16, or int32 for quantised captures)
+    const TypedArray = TYPED_ARRAYS[rawStore.meta.dtype.slice(1)] || Int16Array;
+    let finalData = new TypedArray(end - start);
     let finalDataOffset = 0;
 
     // Fetch data chunk by chunk, using cache when possible